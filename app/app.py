@@ -4,12 +4,12 @@ Streamlit Web Interface for Annual Report Analyzer
 
 import streamlit as st
 import os
-from rag_system import AnnualReportRAG
+from rag_system import AnnualReportRAG, build_llm
+from embeddings import build_default_embeddings
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
 # Page configuration
 st.set_page_config(
     page_title="Annual Report Analyzer",
@@ -17,11 +17,40 @@ st.set_page_config(
     layout="wide"
 )
 
+
+@st.cache_resource(show_spinner=False)
+def load_environment() -> None:
+    """Load environment variables once per process, not on every rerun."""
+    load_dotenv()
+
+
+load_environment()
+
+
+@st.cache_resource(show_spinner=False)
+def get_embedder() -> Embeddings:
+    """Load the embedding model once and share it across sessions and reruns."""
+    return build_default_embeddings()
+
+
+@st.cache_resource(show_spinner=False)
+def get_llm(api_key: str) -> BaseChatModel:
+    """Create the Gemini client once per API key and share it across sessions."""
+    return build_llm(api_key)
+
+
 # Initialize session state
 if 'rag_system' not in st.session_state:
     st.session_state.rag_system = None
 if 'current_pdf' not in st.session_state:
     st.session_state.current_pdf = None
+if 'question' not in st.session_state:
+    st.session_state.question = ""
+
+
+def use_example(example: str) -> None:
+    """Fill the question box with an example question."""
+    st.session_state.question = example
 
 # Header
 st.title("📊 Company Annual Report Analyzer")
@@ -54,23 +83,17 @@ with st.sidebar:
             else:
                 try:
                     with st.spinner("Initializing RAG system..."):
+                        # Each session gets its own index; the model weights
+                        # and LLM client are shared process-wide
                         st.session_state.rag_system = AnnualReportRAG(
-                            google_api_key=api_key,
-                            persist_directory="./chroma_db"
+                            persist_directory="./chroma_db",
+                            embeddings=get_embedder(),
+                            llm=get_llm(api_key)
                         )
                     
-                    # Save uploaded file temporarily
-                    with st.spinner("Loading PDF document..."):
-                        temp_pdf_path = f"temp_{pdf_file.name}"
-                        with open(temp_pdf_path, "wb") as f:
-                            f.write(pdf_file.getvalue())
-                    
+                    # The upload is parsed in place, without a temporary file
                     with st.spinner("Creating embeddings and vector store... This may take a few minutes."):
-                        st.session_state.rag_system.load_and_index_documents([temp_pdf_path])
-                    
-                    # Clean up temp file
-                    if os.path.exists(temp_pdf_path):
-                        os.remove(temp_pdf_path)
+                        st.session_state.rag_system.load_and_index_documents([pdf_file])
                     
                     st.session_state.current_pdf = pdf_file.name
                     st.success(f"✅ Successfully loaded and indexed: {pdf_file.name}")
@@ -85,18 +108,24 @@ with st.sidebar:
 # Main area for Q&A
 st.header("2️⃣ Ask Questions")
 
-# Question input
-question = st.text_input(
-    "Your Question",
-    placeholder="e.g., What was the total revenue in 2024?",
-    help="Ask any question about the annual report"
-)
-
-# Options
-show_sources = st.checkbox("Show source documents", value=True)
+# Question form: typing and toggling options don't rerun the script
+# until the question is submitted
+with st.form("qa_form"):
+    # Question input
+    question = st.text_input(
+        "Your Question",
+        key="question",
+        placeholder="e.g., What was the total revenue in 2024?",
+        help="Ask any question about the annual report"
+    )
+    
+    # Options
+    show_sources = st.checkbox("Show source documents", value=True)
+    
+    # Ask button
+    submitted = st.form_submit_button("Ask Question", type="primary")
 
-# Ask button
-if st.button("Ask Question", type="primary"):
+if submitted:
     if not question or question.strip() == "":
         st.warning("⚠️ Please enter a question.")
     elif st.session_state.rag_system is None:
@@ -138,5 +167,4 @@ examples = [
 cols = st.columns(2)
 for i, example in enumerate(examples):
     with cols[i % 2]:
-        if st.button(example, key=f"example_{i}"):
-            st.rerun()
+        st.button(example, key=f"example_{i}", on_click=use_example, args=(example,))
@@ -0,0 +1,312 @@
+"""
+Embedding helpers for the RAG system
+Builds the sentence embedding model and wraps it with caching for repeated queries.
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+import numpy as np
+import torch
+from langchain_core.embeddings import Embeddings
+from langchain_huggingface import HuggingFaceEmbeddings
+from sentence_transformers import SentenceTransformer
+
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def build_embeddings(onnx_model_dir: Optional[str] = None) -> Embeddings:
+    """
+    Build the sentence embedding model for this machine.
+    
+    Uses the GPU in fp16 when available, otherwise an int8 ONNX Runtime
+    export if onnx_model_dir points at one, otherwise PyTorch on the CPU
+    (under bf16 autocast where the CPU has native bf16 matmul support).
+    
+    Args:
+        onnx_model_dir: Directory with an exported (quantized) ONNX model
+        
+    Returns:
+        Embeddings producing L2-normalized vectors
+    """
+    if torch.cuda.is_available():
+        return ReducedPrecisionEmbeddings(device='cuda')
+    if onnx_model_dir and os.path.isdir(onnx_model_dir):
+        return OnnxEmbeddings(onnx_model_dir)
+    if _cpu_supports_bf16():
+        return ReducedPrecisionEmbeddings(device='cpu')
+    
+    return HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL_NAME,
+        model_kwargs={'device': 'cpu'},
+        encode_kwargs={'batch_size': 128, 'normalize_embeddings': True}
+    )
+
+
+def build_default_embeddings() -> Embeddings:
+    """
+    Build the embedding model used by the app and the CLI.
+    
+    The backend comes from build_embeddings (with the ONNX export in
+    EMBEDDINGS_ONNX_DIR, if set), and query vectors are cached so repeated
+    questions skip the model.
+    
+    Returns:
+        Query-caching embeddings producing L2-normalized vectors
+    """
+    return CachedEmbeddings(build_embeddings(os.getenv("EMBEDDINGS_ONNX_DIR")))
+
+
+def backend_tag(embeddings: Embeddings) -> str:
+    """
+    Describe which embedding backend produces vectors, for cache keys.
+    
+    Vectors from different backends (fp32, fp16, bf16, int8 ONNX) differ
+    slightly, so cached embeddings must not be mixed across them.
+    
+    Args:
+        embeddings: Embedding model, possibly wrapped in CachedEmbeddings
+        
+    Returns:
+        Tag naming the model class, device and model
+    """
+    while isinstance(embeddings, CachedEmbeddings):
+        embeddings = embeddings.embeddings
+    
+    if isinstance(embeddings, HuggingFaceEmbeddings):
+        device = embeddings.model_kwargs.get('device', 'cpu')
+        model = embeddings.model_name
+    elif isinstance(embeddings, OnnxEmbeddings):
+        device = 'cpu'
+        model = embeddings.model_path
+    else:
+        device = getattr(embeddings, 'device', '')
+        model = getattr(embeddings, 'model_name', '')
+    return f"{type(embeddings).__name__}:{device}:{model}"
+
+
+def _cpu_supports_bf16() -> bool:
+    """Return True if the CPU has AVX-512 BF16 or AMX bf16 matmul units."""
+    checks = (
+        getattr(torch.cpu, "_is_avx512_bf16_supported", None),
+        getattr(torch.cpu, "_is_amx_tile_supported", None)
+    )
+    return any(check is not None and check() for check in checks)
+
+
+class ReducedPrecisionEmbeddings(Embeddings):
+    """Sentence-transformers embeddings computed in fp16 (GPU) or bf16 (CPU)."""
+    
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL_NAME,
+        device: str = 'cpu',
+        batch_size: int = 128
+    ):
+        """
+        Load the embedding model.
+        
+        Args:
+            model_name: Sentence-transformers model to load
+            device: 'cuda' for fp16 weights, 'cpu' for bf16 autocast
+            batch_size: Number of texts encoded per forward pass
+        """
+        self.model = SentenceTransformer(model_name, device=device)
+        self.model_name = model_name
+        self.device = device
+        self.batch_size = batch_size
+        if device == 'cuda':
+            self.model.half()
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts into L2-normalized float32 vectors.
+        
+        Args:
+            texts: Texts to encode
+            
+        Returns:
+            (len(texts), dim) float32 array
+        """
+        # bf16 tensors cannot be converted to NumPy directly, so keep the
+        # result as a tensor and upcast before leaving torch
+        with torch.autocast(device_type='cpu', dtype=torch.bfloat16, enabled=self.device == 'cpu'):
+            vectors = self.model.encode(
+                texts,
+                batch_size=self.batch_size,
+                normalize_embeddings=True,
+                convert_to_tensor=True,
+                show_progress_bar=False
+            )
+        return vectors.float().cpu().numpy()
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed document texts.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            List of embedding vectors
+        """
+        if not texts:
+            return []
+        return self._encode(texts).tolist()
+    
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query.
+        
+        Args:
+            text: Query text
+            
+        Returns:
+            Embedding vector
+        """
+        return self._encode([text])[0].tolist()
+
+
+class OnnxEmbeddings(Embeddings):
+    """MiniLM sentence embeddings served by ONNX Runtime on the CPU."""
+    
+    def __init__(
+        self,
+        model_dir: str,
+        tokenizer_name: str = EMBEDDING_MODEL_NAME,
+        batch_size: int = 128,
+        max_length: int = 256
+    ):
+        """
+        Load an ONNX export of the embedding model.
+        
+        Args:
+            model_dir: Directory with model.onnx or model_quantized.onnx
+            tokenizer_name: Tokenizer matching the exported model
+            batch_size: Number of texts encoded per forward pass
+            max_length: Maximum tokens per text (MiniLM was trained on 256)
+        """
+        # Imported lazily: optimum/onnxruntime are only needed for this backend
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+        
+        file_name = "model_quantized.onnx"
+        if not os.path.exists(os.path.join(model_dir, file_name)):
+            file_name = "model.onnx"
+        
+        self.model = ORTModelForFeatureExtraction.from_pretrained(model_dir, file_name=file_name)
+        self.model_path = os.path.join(os.path.abspath(model_dir), file_name)
+        self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+        self.batch_size = batch_size
+        self.max_length = max_length
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Mean-pool token embeddings and L2-normalize them.
+        
+        Args:
+            texts: Texts to encode
+            
+        Returns:
+            (len(texts), dim) float32 array
+        """
+        inputs = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np"
+        )
+        hidden = self.model(**inputs).last_hidden_state
+        
+        mask = inputs["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled.astype(np.float32)
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed document texts in batches.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            List of embedding vectors
+        """
+        vectors = [
+            self._encode(texts[i:i + self.batch_size])
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        return np.vstack(vectors).tolist() if vectors else []
+    
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query.
+        
+        Args:
+            text: Query text
+            
+        Returns:
+            Embedding vector
+        """
+        return self._encode([text])[0].tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that memoizes query vectors in an LRU cache."""
+    
+    def __init__(self, embeddings: Embeddings, maxsize: int = 1024):
+        """
+        Initialize cached embeddings.
+        
+        Args:
+            embeddings: Underlying embedding model
+            maxsize: Maximum number of query vectors to keep
+        """
+        self.embeddings = embeddings
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed document texts (not cached, each corpus is embedded once).
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            List of embedding vectors
+        """
+        return self.embeddings.embed_documents(texts)
+    
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query, reusing the cached vector for repeated queries.
+        
+        Args:
+            text: Query text
+            
+        Returns:
+            Embedding vector
+        """
+        key = hashlib.sha256(text.encode("utf-8")).digest()
+        
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is not None:
+                self._cache.move_to_end(key)
+                return list(vector)
+        
+        vector = self.embeddings.embed_query(text)
+        
+        with self._lock:
+            self._cache[key] = vector
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        
+        return list(vector)
@@ -3,11 +3,69 @@ PDF Document Processor for Annual Reports
 Handles loading, chunking, and preprocessing of PDF documents.
 """
 
-from typing import List
+import queue
+import threading
+from typing import BinaryIO, Iterator, List, Union
+from pypdf import PdfReader
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
-import re
+
+# Compiled recursive chunker; falls back to LangChain's pure-Python splitter
+try:
+    from chonkie import RecursiveChunker
+except ImportError:
+    RecursiveChunker = None
+
+# Prefer RE2's linear-time DFA engine when installed; it shares the
+# compile/sub/findall API with the standard library module
+try:
+    import re2 as _regex
+    _HAS_RE2 = True
+except ImportError:
+    import re as _regex
+    _HAS_RE2 = False
+
+
+# Precompiled patterns for the per-page cleaning and extraction hot paths.
+# RE2's \w and \s are ASCII-only, so spell out the Unicode classes that
+# Python's re matches implicitly (accented letters, non-breaking spaces).
+# RE2's \s is just [\t\n\f\r ] and \p{Z} misses the control characters
+# \v, \x1c-\x1f and \x85 that Python's \s includes, so list them too.
+if _HAS_RE2:
+    _WS_RE = _regex.compile(r'[\s\v\x1c-\x1f\x85\p{Z}]+')
+    _KEEP_RE = _regex.compile(r'[^\p{L}\p{N}_\s\v\x1c-\x1f\x85\p{Z}\$\%\.\,\-\(\)\:\;\/]')
+else:
+    _WS_RE = _regex.compile(r'\s+')
+    # Keep: numbers, letters, common punctuation, $, %, etc.
+    _KEEP_RE = _regex.compile(r'[^\w\s\$\%\.\,\-\(\)\:\;\/]')
+# Financial figures, matched in a single pass:
+# - currency amounts: $123,456.78 or $123.4 million/billion
+# - percentages: 12.5%
+# - large numbers with commas: 1,234,567
+_FIG_RE = _regex.compile(
+    r'(?i)(?P<cur>\$[\d,]+\.?\d*\s*(?:million|billion|trillion)?)'
+    r'|(?P<pct>\d+\.?\d*\s*%)'
+    r'|(?P<num>\d{1,3}(?:,\d{3})+(?:\.\d+)?)'
+)
+
+# End-of-stream marker passed between pipeline stages
+_DONE = object()
+
+
+def source_name(pdf_path: Union[str, BinaryIO]) -> str:
+    """
+    Return a display name for a PDF path or file object.
+    
+    Args:
+        pdf_path: Path to the PDF file, or a binary file object
+        
+    Returns:
+        The path itself, or the file object's name if it has one
+    """
+    if isinstance(pdf_path, str):
+        return pdf_path
+    return getattr(pdf_path, "name", "uploaded.pdf")
 
 
 class PDFProcessor:
@@ -29,27 +87,170 @@ class PDFProcessor:
             length_function=len,
             separators=["\n\n", "\n", " ", ""]
         )
+        # chonkie has no overlap option, so chunk to (size - overlap) and
+        # prepend the overlap from the source text afterwards
+        self.chunker = (
+            RecursiveChunker(chunk_size=max(1, chunk_size - chunk_overlap))
+            if RecursiveChunker is not None
+            else None
+        )
+    
+    def backend_tag(self) -> str:
+        """
+        Describe the text cleaning and chunking settings, for cache keys.
+        
+        Returns:
+            Tag naming the chunk settings, chunker and regex engine
+        """
+        chunker = "chonkie" if self.chunker is not None else "langchain"
+        engine = "re2" if _HAS_RE2 else "re"
+        return f"{self.chunk_size}:{self.chunk_overlap}:{chunker}:{engine}"
     
-    def load_pdf(self, pdf_path: str) -> List[Document]:
+    def load_pdf(self, pdf_path: Union[str, BinaryIO]) -> List[Document]:
         """
         Load and process a PDF document.
         
         Args:
-            pdf_path: Path to the PDF file
+            pdf_path: Path to the PDF file, or a binary file object
             
         Returns:
             List of Document objects with text chunks
         """
-        print(f"Loading PDF: {pdf_path}")
-        loader = PyPDFLoader(pdf_path)
-        documents = loader.load()
+        print(f"Loading PDF: {source_name(pdf_path)}")
+        documents = list(self.lazy_load_pdf(pdf_path))
         print(f"Loaded {len(documents)} pages")
         
-        # Clean and preprocess text
-        for doc in documents:
+        return documents
+    
+    def lazy_load_pdf(self, pdf_path: Union[str, BinaryIO]) -> Iterator[Document]:
+        """
+        Load and clean a PDF document one page at a time.
+        
+        Args:
+            pdf_path: Path to the PDF file, or a binary file object
+            
+        Yields:
+            Cleaned Document for each page
+        """
+        for doc in self._iter_pages(pdf_path):
             doc.page_content = self._clean_text(doc.page_content)
+            yield doc
+    
+    @staticmethod
+    def _iter_pages(pdf_path: Union[str, BinaryIO]) -> Iterator[Document]:
+        """
+        Yield raw page Documents from a PDF path or an in-memory file.
         
-        return documents
+        Args:
+            pdf_path: Path to the PDF file, or a binary file object
+            
+        Yields:
+            Uncleaned Document for each page
+        """
+        if isinstance(pdf_path, str):
+            yield from PyPDFLoader(pdf_path).lazy_load()
+            return
+        
+        # File objects (e.g. Streamlit uploads) are parsed in place rather
+        # than being copied to a temporary file first
+        name = source_name(pdf_path)
+        for page_number, page in enumerate(PdfReader(pdf_path).pages):
+            yield Document(
+                page_content=page.extract_text(),
+                metadata={"source": name, "page": page_number}
+            )
+    
+    def stream_chunks(
+        self,
+        pdf_path: Union[str, BinaryIO],
+        page_batch_size: int = 32,
+        queue_size: int = 64
+    ) -> Iterator[List[Document]]:
+        """
+        Parse and chunk a PDF in background threads, yielding chunks as they
+        become available so the caller can embed while parsing continues.
+        
+        Pages flow parser thread -> bounded queue -> chunker thread -> bounded
+        queue -> caller, so peak memory is bounded by the queue sizes rather
+        than the page count.
+        
+        Args:
+            pdf_path: Path to the PDF file, or a binary file object
+            page_batch_size: Number of pages chunked together
+            queue_size: Maximum items buffered between stages
+            
+        Yields:
+            Lists of chunked documents
+        """
+        print(f"Streaming PDF: {source_name(pdf_path)}")
+        pages: queue.Queue = queue.Queue(maxsize=queue_size)
+        chunks: queue.Queue = queue.Queue(maxsize=queue_size)
+        stop = threading.Event()
+        
+        def put(q: queue.Queue, item: object) -> bool:
+            # Block on a full queue, but give up once the consumer has gone
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def parse() -> None:
+            try:
+                for doc in self._iter_pages(pdf_path):
+                    if not put(pages, doc):
+                        return
+                put(pages, _DONE)
+            except Exception as e:
+                put(pages, e)
+        
+        def chunk() -> None:
+            batch: List[Document] = []
+            try:
+                while True:
+                    item = pages.get()
+                    if item is _DONE or isinstance(item, Exception):
+                        if batch and not put(chunks, self._split_documents(batch)):
+                            return
+                        put(chunks, item)
+                        return
+                    item.page_content = self._clean_text(item.page_content)
+                    batch.append(item)
+                    if len(batch) >= page_batch_size:
+                        if not put(chunks, self._split_documents(batch)):
+                            return
+                        batch = []
+            except Exception as e:
+                put(chunks, e)
+        
+        workers = [
+            threading.Thread(target=parse, daemon=True),
+            threading.Thread(target=chunk, daemon=True)
+        ]
+        for worker in workers:
+            worker.start()
+        
+        total = 0
+        try:
+            while True:
+                item = chunks.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                total += len(item)
+                yield item
+        finally:
+            stop.set()
+            # Unblock a chunker still waiting on the page queue
+            try:
+                pages.put_nowait(_DONE)
+            except queue.Full:
+                pass
+        
+        print(f"Created {total} chunks from {source_name(pdf_path)}")
     
     def chunk_documents(self, documents: List[Document]) -> List[Document]:
         """
@@ -61,11 +262,41 @@ class PDFProcessor:
         Returns:
             List of chunked documents
         """
-        chunks = self.text_splitter.split_documents(documents)
+        chunks = self._split_documents(documents)
         print(f"Created {len(chunks)} chunks from documents")
         return chunks
     
-    def _clean_text(self, text: str) -> str:
+    def _split_documents(self, documents: List[Document]) -> List[Document]:
+        """
+        Split documents into chunks, preserving each document's metadata.
+        
+        Args:
+            documents: List of documents to chunk
+            
+        Returns:
+            List of chunked documents
+        """
+        if self.chunker is None:
+            return self.text_splitter.split_documents(documents)
+        
+        texts = [doc.page_content for doc in documents]
+        chunks = []
+        for doc, text, pieces in zip(
+            documents, texts, self.chunker.chunk_batch(texts, show_progress=False)
+        ):
+            for piece in pieces:
+                start = max(0, piece.start_index - self.chunk_overlap)
+                # Begin the overlap on a word boundary so it never starts
+                # inside a word or figure ("$4,512,300" -> "512,300")
+                if start > 0 and not text[start - 1].isspace():
+                    start = text.find(' ', start, piece.start_index) + 1 or piece.start_index
+                content = text[start:piece.end_index].strip()
+                if content:
+                    chunks.append(Document(page_content=content, metadata=dict(doc.metadata)))
+        return chunks
+    
+    @staticmethod
+    def _clean_text(text: str) -> str:
         """
         Clean and normalize text content.
         
@@ -75,16 +306,12 @@ class PDFProcessor:
         Returns:
             Cleaned text
         """
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove special characters but keep financial symbols
-        # Keep: numbers, letters, common punctuation, $, %, etc.
-        text = re.sub(r'[^\w\s\$\%\.\,\-\(\)\:\;\/]', '', text)
-        
-        return text.strip()
+        # Remove special characters but keep financial symbols, then
+        # collapse the remaining whitespace
+        return _WS_RE.sub(' ', _KEEP_RE.sub('', text)).strip()
     
-    def extract_financial_data(self, text: str) -> List[str]:
+    @staticmethod
+    def extract_financial_data(text: str) -> List[str]:
         """
         Extract financial figures and numbers from text.
         
@@ -92,20 +319,10 @@ class PDFProcessor:
             text: Text to extract from
             
         Returns:
-            List of extracted financial figures
-        """
-        # Pattern for currency amounts: $123,456.78 or $123.4 million/billion
-        currency_pattern = r'\$[\d,]+\.?\d*\s*(?:million|billion|trillion)?'
-        
-        # Pattern for percentages: 12.5%
-        percentage_pattern = r'\d+\.?\d*\s*%'
+            List of extracted financial figures, in document order
         
-        # Pattern for large numbers with commas
-        number_pattern = r'\d{1,3}(?:,\d{3})+(?:\.\d+)?'
-        
-        figures = []
-        figures.extend(re.findall(currency_pattern, text, re.IGNORECASE))
-        figures.extend(re.findall(percentage_pattern, text))
-        figures.extend(re.findall(number_pattern, text))
-        
-        return figures
+        Matches do not overlap: a currency amount such as "$4,512,300" is
+        reported once (not also as "4,512,300"), and a percentage with a
+        thousands separator such as "1,234.5%" is reported as "1,234.5".
+        """
+        return [match.group(0) for match in _FIG_RE.finditer(text)]
@@ -4,15 +4,120 @@ Implements retrieval-augmented generation for accurate question answering.
 """
 
 import os
-from typing import List, Optional, Any
-from langchain_community.vectorstores import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
+import time
+import uuid
+import sqlite3
+import hashlib
+import pickle
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Any, Tuple, Union
+import faiss
+import numpy as np
+from chromadb.utils.batch_utils import create_batches
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import Chroma, FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import PromptTemplate, ChatPromptTemplate
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableLambda, RunnableParallel, RunnablePassthrough
 from pdf_processor import PDFProcessor
+from embeddings import backend_tag, build_default_embeddings
+
+# sqlite-vec backs large corpora when installed and loadable; Chroma otherwise
+try:
+    import sqlite_vec_store
+    SqliteVecStore = sqlite_vec_store.SqliteVecStore if sqlite_vec_store.is_supported() else None
+except ImportError:
+    SqliteVecStore = None
+
+
+# Corpora below this many chunks use an in-memory FAISS inner-product index;
+# larger ones are stored on disk with sqlite-vec (or Chroma as a fallback).
+FAISS_MAX_CHUNKS = 50_000
+
+# File name of the sqlite-vec database inside the persist directory
+SQLITE_VEC_FILENAME = "vectors.db"
+
+# Embedding matrix and chunk list written next to the FAISS index by earlier
+# versions; removed on rebuild (both are now read from the index itself)
+EMBEDDING_MATRIX_FILENAME = "emb.npy"
+CHUNK_META_FILENAME = "meta.pkl"
+
+# Per-PDF chunk/embedding cache: bump the version when the cached format
+# or processing changes, and keep only the most recently used entries
+PDF_CACHE_VERSION = 2
+MAX_CACHED_PDFS = 16
+# Age after which a .tmp file from an interrupted cache save is deleted
+STALE_TMP_SECONDS = 3600
+
+# Number of chunks sent to the embedding model per call
+EMBED_BATCH_SIZE = 128
+
+
+def _load_and_chunk(pdf_path: str, chunk_size: int, chunk_overlap: int) -> List[Document]:
+    """
+    Load and chunk a single PDF. Module-level so worker processes can run it.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        chunk_size: Size of text chunks
+        chunk_overlap: Overlap between chunks
+        
+    Returns:
+        List of chunked documents
+    """
+    processor = PDFProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return processor.chunk_documents(processor.load_pdf(pdf_path))
+
+
+def build_llm(google_api_key: str, model_name: str = "gemini-flash-latest") -> BaseChatModel:
+    """
+    Build the Gemini chat model used to answer questions.
+    
+    Args:
+        google_api_key: Google API key
+        model_name: Gemini model to use
+        
+    Returns:
+        Chat model configured for factual answers
+    """
+    return ChatGoogleGenerativeAI(
+        model=model_name,
+        temperature=0,  # Low temperature for factual accuracy
+        google_api_key=google_api_key
+    )
+
+
+@lru_cache(maxsize=32)
+def _figure_set(text: str) -> frozenset:
+    """
+    Extract the set of financial figures in a text, memoized per text.
+    
+    Currency amounts also contribute their bare number ("$4,512,300" adds
+    "4,512,300"), so answers quoting a figure without the $ still validate.
+    
+    Args:
+        text: Text to extract from
+        
+    Returns:
+        Set of extracted financial figures
+    """
+    figures = set()
+    for figure in PDFProcessor.extract_financial_data(text):
+        figures.add(figure)
+        if figure.startswith('$'):
+            # Bare number of a currency amount: "$1.2 million" -> "1.2"
+            parts = figure[1:].split()
+            number = parts[0].rstrip('.,') if parts else ''
+            if number:
+                figures.add(number)
+    return frozenset(figures)
 
 
 class AnnualReportRAG:
@@ -20,78 +125,451 @@ class AnnualReportRAG:
     
     def __init__(
         self,
-        google_api_key: str,
+        google_api_key: Optional[str] = None,
         persist_directory: str = "./chroma_db",
-        model_name: str = "gemini-flash-latest"
+        model_name: str = "gemini-flash-latest",
+        quantize_embeddings: bool = True,
+        embeddings: Optional[Embeddings] = None,
+        llm: Optional[BaseChatModel] = None
     ):
         """
         Initialize RAG system.
         
         Args:
-            google_api_key: Google API key
+            google_api_key: Google API key (only needed when llm is not given)
             persist_directory: Directory to persist vector store
             model_name: Gemini model to use
+            quantize_embeddings: Store FAISS vectors as int8 instead of float32
+            embeddings: Pre-built embedding model to share across instances
+            llm: Pre-built chat model to share across instances
         """
         self.google_api_key = google_api_key
         self.persist_directory = persist_directory
         self.model_name = model_name
+        self.quantize_embeddings = quantize_embeddings
         
-        # Initialize components
-        # Use HuggingFace embeddings (free, local, no API limits)
-        print(f"Loading embedding model... (first time may take a minute to download)")
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2",
-            model_kwargs={'device': 'cpu'}
-        )
-        self.llm = ChatGoogleGenerativeAI(
-            model=model_name,
-            temperature=0,  # Low temperature for factual accuracy
-            google_api_key=google_api_key
-        )
+        # Initialize components, reusing any that were passed in
+        if embeddings is None:
+            # Use local sentence-transformer embeddings (free, no API limits);
+            # CPU-only hosts use an ONNX Runtime export when one is configured
+            print(f"Loading embedding model... (first time may take a minute to download)")
+            embeddings = build_default_embeddings()
+        self.embeddings = embeddings
+        
+        if llm is None:
+            if not google_api_key:
+                raise ValueError("google_api_key is required when no llm is provided")
+            llm = build_llm(google_api_key, model_name)
+        self.llm = llm
         
-        self.vectorstore: Optional[Chroma] = None
+        self.vectorstore: Optional[Any] = None
         self.qa_chain: Optional[Any] = None
         self.retriever: Optional[Any] = None
         self.pdf_processor = PDFProcessor()
         
-    def load_and_index_documents(self, pdf_paths: List[str]) -> None:
+        # Normalized (N, dim) embeddings of a flat FAISS index and matching
+        # chunks for brute-force NumPy search on small corpora
+        self._emb_matrix: Optional[np.ndarray] = None
+        self._chunk_meta: List[Document] = []
+        
+    def load_and_index_documents(self, pdf_paths: List[Union[str, BinaryIO]]) -> None:
         """
         Load PDF documents and create vector store.
         
         Args:
-            pdf_paths: List of paths to PDF files
+            pdf_paths: List of paths to PDF files, or binary file objects
         """
-        all_chunks = []
+        os.makedirs(self.persist_directory, exist_ok=True)
+        
+        # Reuse chunks and embeddings cached from an earlier run on the same
+        # file contents; only the remaining PDFs are parsed and embedded
+        digests = [self._pdf_digest(pdf_path) for pdf_path in pdf_paths]
+        results = [self._load_cached_pdf(digest) for digest in digests]
+        pending = [i for i, result in enumerate(results) if result is None]
         
-        for pdf_path in pdf_paths:
-            # Load and chunk each PDF
-            documents = self.pdf_processor.load_pdf(pdf_path)
-            chunks = self.pdf_processor.chunk_documents(documents)
-            all_chunks.extend(chunks)
+        # Iterate the generator to exhaustion so its worker pool shuts down
+        # before the index is built
+        processed = self._process_pdfs([pdf_paths[i] for i in pending])
+        for j, (chunks, vectors) in enumerate(processed):
+            i = pending[j]
+            self._save_cached_pdf(digests[i], chunks, vectors)
+            results[i] = (chunks, vectors)
+        
+        all_chunks = list(itertools.chain.from_iterable(chunks for chunks, _ in results))
+        if not all_chunks:
+            raise ValueError("No text could be extracted from the provided PDFs")
+        vectors = np.vstack([vectors for chunks, vectors in results if chunks]).astype(np.float32)
+        # Normalize once here so inner product is cosine similarity for every
+        # store; queries come L2-normalized from the embedding model
+        faiss.normalize_L2(vectors)
         
         print(f"Total chunks to index: {len(all_chunks)}")
         
-        # Create vector store
-        self.vectorstore = Chroma.from_documents(
-            documents=all_chunks,
-            embedding=self.embeddings,
-            persist_directory=self.persist_directory
-        )
+        texts = [chunk.page_content for chunk in all_chunks]
+        metadatas = [chunk.metadata for chunk in all_chunks]
+        
+        # Create vector store from the precomputed vectors; drop the old
+        # matrix view first so nothing still references the old index files
+        self._emb_matrix = None
+        self._chunk_meta = []
+        self._remove_persisted_indexes()
+        if len(all_chunks) < FAISS_MAX_CHUNKS:
+            # Inner-product search over L2-normalized vectors (cosine)
+            self.vectorstore = FAISS(
+                embedding_function=self.embeddings,
+                index=self._create_faiss_index(vectors),
+                docstore=InMemoryDocstore(),
+                index_to_docstore_id={},
+                distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+            )
+            self.vectorstore.add_embeddings(zip(texts, vectors), metadatas=metadatas)
+            self.vectorstore.save_local(self.persist_directory)
+            
+            self._emb_matrix = self._flat_index_matrix(self.vectorstore.index)
+            if self._emb_matrix is not None:
+                self._chunk_meta = all_chunks
+        else:
+            self.vectorstore = self._create_sqlite_vec_store(texts, vectors, metadatas)
+            if self.vectorstore is None:
+                self.vectorstore = self._create_chroma_store(texts, vectors, metadatas)
         
         print(f"Vector store created and persisted to {self.persist_directory}")
         
         # Create QA chain
         self._create_qa_chain()
     
+    def _process_pdfs(
+        self,
+        pdf_paths: List[Union[str, BinaryIO]]
+    ) -> Iterator[Tuple[List[Document], np.ndarray]]:
+        """
+        Parse, chunk and embed PDFs, yielding results in input order.
+        
+        Args:
+            pdf_paths: List of paths to PDF files, or binary file objects
+            
+        Yields:
+            Tuple of each PDF's chunks and their embedding matrix
+        """
+        # Only paths are handed to worker processes; file objects stay in
+        # this process rather than being pickled across
+        if len(pdf_paths) > 1 and all(isinstance(p, str) for p in pdf_paths):
+            load_and_chunk = partial(
+                _load_and_chunk,
+                chunk_size=self.pdf_processor.chunk_size,
+                chunk_overlap=self.pdf_processor.chunk_overlap
+            )
+            # Parsing and cleaning are CPU-bound and independent per file;
+            # each PDF's chunks are embedded as soon as its worker finishes
+            workers = min(len(pdf_paths), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for chunks in executor.map(load_and_chunk, pdf_paths):
+                    yield self._embed_chunk_batches([chunks])
+        else:
+            # Embed early chunks while later pages are still being parsed
+            for pdf_path in pdf_paths:
+                yield self._embed_chunk_batches(self.pdf_processor.stream_chunks(pdf_path))
+    
+    def _pdf_digest(self, pdf_path: Union[str, BinaryIO]) -> str:
+        """
+        Hash a PDF's contents together with everything that shapes its cached
+        chunks and embeddings: chunk settings, chunker, regex engine and
+        embedding backend.
+        
+        Args:
+            pdf_path: Path to the PDF file, or a binary file object
+            
+        Returns:
+            Hex SHA-256 digest identifying the file's chunks
+        """
+        digest = hashlib.sha256()
+        if isinstance(pdf_path, str):
+            with open(pdf_path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        else:
+            pdf_path.seek(0)
+            for block in iter(lambda: pdf_path.read(1 << 20), b""):
+                digest.update(block)
+            pdf_path.seek(0)
+        digest.update(
+            f"v{PDF_CACHE_VERSION}|{self.pdf_processor.backend_tag()}|{backend_tag(self.embeddings)}".encode()
+        )
+        return digest.hexdigest()
+    
+    def _load_cached_pdf(self, digest: str) -> Optional[Tuple[List[Document], np.ndarray]]:
+        """
+        Load chunks and embeddings cached for a PDF digest.
+        
+        Args:
+            digest: Digest from _pdf_digest
+            
+        Returns:
+            Tuple of chunks and embedding matrix, or None if not cached
+        """
+        chunks_path = os.path.join(self.persist_directory, f"chunks_{digest}.pkl")
+        embeddings_path = os.path.join(self.persist_directory, f"embeddings_{digest}.npy")
+        if not (os.path.exists(chunks_path) and os.path.exists(embeddings_path)):
+            return None
+        
+        with open(chunks_path, "rb") as f:
+            chunks = pickle.load(f)
+        # Mark the entry as recently used for pruning
+        os.utime(chunks_path)
+        print(f"Loaded {len(chunks)} cached chunks for {digest[:12]}")
+        return chunks, np.load(embeddings_path)
+    
+    def _save_cached_pdf(self, digest: str, chunks: List[Document], vectors: np.ndarray) -> None:
+        """
+        Cache a PDF's chunks and embeddings under its digest.
+        
+        Args:
+            digest: Digest from _pdf_digest
+            chunks: Chunked documents
+            vectors: Embedding matrix for the chunks
+        """
+        chunks_path = os.path.join(self.persist_directory, f"chunks_{digest}.pkl")
+        embeddings_path = os.path.join(self.persist_directory, f"embeddings_{digest}.npy")
+        
+        # Write to temporary files first so an interrupted run never leaves
+        # a partial cache entry behind
+        with open(chunks_path + ".tmp", "wb") as f:
+            pickle.dump(chunks, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(embeddings_path + ".tmp", "wb") as f:
+            np.save(f, vectors)
+        os.replace(embeddings_path + ".tmp", embeddings_path)
+        os.replace(chunks_path + ".tmp", chunks_path)
+        
+        self._prune_pdf_cache()
+    
+    def _prune_pdf_cache(self) -> None:
+        """
+        Delete all but the MAX_CACHED_PDFS most recently used cache entries,
+        plus stale .tmp files left behind by interrupted saves.
+        """
+        now = time.time()
+        for name in os.listdir(self.persist_directory):
+            path = os.path.join(self.persist_directory, name)
+            if (
+                name.startswith(("chunks_", "embeddings_"))
+                and name.endswith(".tmp")
+                and now - os.path.getmtime(path) > STALE_TMP_SECONDS
+            ):
+                os.remove(path)
+        
+        entries = sorted(
+            (
+                name for name in os.listdir(self.persist_directory)
+                if name.startswith("chunks_") and name.endswith(".pkl")
+            ),
+            key=lambda name: os.path.getmtime(os.path.join(self.persist_directory, name)),
+            reverse=True
+        )
+        for name in entries[MAX_CACHED_PDFS:]:
+            digest = name[len("chunks_"):-len(".pkl")]
+            for filename in (name, f"embeddings_{digest}.npy"):
+                path = os.path.join(self.persist_directory, filename)
+                if os.path.exists(path):
+                    os.remove(path)
+    
+    def _load_embedding_matrix(self) -> None:
+        """
+        Set up NumPy search from the loaded FAISS store without reading any
+        extra files: the matrix is a view of the flat index's vectors and the
+        chunks come from the docstore already unpickled by FAISS.load_local.
+        """
+        self._emb_matrix = self._flat_index_matrix(self.vectorstore.index)
+        if self._emb_matrix is None:
+            return
+        
+        docstore = self.vectorstore.docstore
+        index_to_id = self.vectorstore.index_to_docstore_id
+        self._chunk_meta = [docstore.search(index_to_id[i]) for i in range(len(self._emb_matrix))]
+    
+    def _create_sqlite_vec_store(
+        self,
+        texts: List[str],
+        vectors: np.ndarray,
+        metadatas: List[dict]
+    ) -> Optional[Any]:
+        """
+        Build the sqlite-vec store for a large corpus.
+        
+        Args:
+            texts: Chunk texts
+            vectors: Embedding matrix for the texts
+            metadatas: Metadata per text
+            
+        Returns:
+            Populated SqliteVecStore, or None if sqlite-vec cannot be used
+        """
+        if SqliteVecStore is None:
+            return None
+        
+        db_path = os.path.join(self.persist_directory, SQLITE_VEC_FILENAME)
+        try:
+            store = SqliteVecStore(db_path, self.embeddings)
+            store.add_embeddings(texts, vectors, metadatas)
+        except (AttributeError, sqlite3.Error) as e:
+            print(f"sqlite-vec unavailable ({e}); falling back to Chroma")
+            if os.path.exists(db_path):
+                os.remove(db_path)
+            return None
+        return store
+    
+    def _create_chroma_store(
+        self,
+        texts: List[str],
+        vectors: np.ndarray,
+        metadatas: List[dict]
+    ) -> Chroma:
+        """
+        Build the Chroma store for a large corpus from precomputed vectors.
+        
+        Args:
+            texts: Chunk texts
+            vectors: Embedding matrix for the texts
+            metadatas: Metadata per text
+            
+        Returns:
+            Populated Chroma vector store
+        """
+        store = Chroma(
+            persist_directory=self.persist_directory,
+            embedding_function=self.embeddings
+        )
+        ids = [str(uuid.uuid4()) for _ in texts]
+        for batch in create_batches(
+            api=store._client,
+            ids=ids,
+            embeddings=vectors.tolist(),
+            metadatas=metadatas,
+            documents=texts
+        ):
+            store._collection.add(
+                ids=batch[0],
+                embeddings=batch[1],
+                metadatas=batch[2],
+                documents=batch[3]
+            )
+        return store
+    
+    def _remove_persisted_indexes(self) -> None:
+        """Remove FAISS/sqlite-vec files left by a previous index build."""
+        for filename in (
+            "index.faiss",
+            "index.pkl",
+            EMBEDDING_MATRIX_FILENAME,
+            CHUNK_META_FILENAME,
+            SQLITE_VEC_FILENAME
+        ):
+            path = os.path.join(self.persist_directory, filename)
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def _embed_chunk_batches(
+        self,
+        chunk_batches: Iterable[List[Document]]
+    ) -> Tuple[List[Document], np.ndarray]:
+        """
+        Embed chunks in fixed-size batches as they arrive from the loader.
+        
+        Args:
+            chunk_batches: Iterable of chunk lists, possibly still being produced
+            
+        Returns:
+            Tuple of all chunks and their (N, dim) float32 embedding matrix
+        """
+        all_chunks: List[Document] = []
+        vectors: List[np.ndarray] = []
+        pending: List[Document] = []
+        
+        def embed(batch: List[Document]) -> None:
+            texts = [chunk.page_content for chunk in batch]
+            vectors.append(np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32))
+            all_chunks.extend(batch)
+        
+        for chunks in chunk_batches:
+            pending.extend(chunks)
+            while len(pending) >= EMBED_BATCH_SIZE:
+                embed(pending[:EMBED_BATCH_SIZE])
+                pending = pending[EMBED_BATCH_SIZE:]
+        if pending:
+            embed(pending)
+        
+        if not vectors:
+            return all_chunks, np.empty((0, 0), dtype=np.float32)
+        return all_chunks, np.vstack(vectors)
+    
+    @staticmethod
+    def _flat_index_matrix(index: faiss.Index) -> Optional[np.ndarray]:
+        """
+        View the float32 vectors stored in a flat FAISS index as a NumPy matrix.
+        
+        The view shares the index's memory, so the NumPy search in
+        get_similar_chunks and the FAISS retriever score the same vectors
+        exactly. Quantized indexes store no float32 vectors and return None;
+        both searches then go through the index.
+        
+        Args:
+            index: FAISS index of the vector store
+            
+        Returns:
+            (N, dim) float32 view, valid while the index is alive, or None
+        """
+        if not isinstance(index, faiss.IndexFlat) or index.ntotal == 0:
+            return None
+        return faiss.rev_swig_ptr(index.get_xb(), index.ntotal * index.d).reshape(index.ntotal, index.d)
+    
+    def _create_faiss_index(self, vectors: np.ndarray) -> faiss.Index:
+        """
+        Create an empty FAISS inner-product index for the given vectors.
+        
+        Args:
+            vectors: L2-normalized corpus embeddings, used to calibrate int8 quantization
+            
+        Returns:
+            FAISS index ready for vectors to be added
+        """
+        dimension = vectors.shape[1]
+        if not self.quantize_embeddings:
+            return faiss.IndexFlatIP(dimension)
+        
+        # 8-bit scalar quantizer: per-dimension ranges are trained on the
+        # normalized corpus, then each vector is stored in 1 byte/dim
+        index = faiss.IndexScalarQuantizer(
+            dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+        )
+        index.train(vectors)
+        return index
+    
     def load_existing_vectorstore(self) -> None:
         """Load existing vector store from disk."""
         if not os.path.exists(self.persist_directory):
             raise ValueError(f"Vector store not found at {self.persist_directory}")
         
-        self.vectorstore = Chroma(
-            persist_directory=self.persist_directory,
-            embedding_function=self.embeddings
-        )
+        self._emb_matrix = None
+        self._chunk_meta = []
+        if os.path.exists(os.path.join(self.persist_directory, "index.faiss")):
+            self.vectorstore = FAISS.load_local(
+                self.persist_directory,
+                self.embeddings,
+                allow_dangerous_deserialization=True,  # Index written by us
+                distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+            )
+            self._load_embedding_matrix()
+        elif os.path.exists(os.path.join(self.persist_directory, SQLITE_VEC_FILENAME)):
+            if SqliteVecStore is None:
+                raise ValueError("sqlite-vec is required to load this vector store")
+            self.vectorstore = SqliteVecStore(
+                os.path.join(self.persist_directory, SQLITE_VEC_FILENAME),
+                self.embeddings
+            )
+        else:
+            self.vectorstore = Chroma(
+                persist_directory=self.persist_directory,
+                embedding_function=self.embeddings
+            )
         
         print(f"Loaded existing vector store from {self.persist_directory}")
         self._create_qa_chain()
@@ -126,22 +604,33 @@ Detailed Answer (with exact figures from the context):"""
             search_kwargs={"k": 5}  # Retrieve top 5 most relevant chunks
         )
         
-        # Helper function to format documents
-        def format_docs(docs):
-            return "\n\n".join(doc.page_content for doc in docs)
+        # Helper function to format documents; the raw documents are passed
+        # along with the prompt context so they can be returned as sources
+        def pack_docs(docs):
+            return {"context": "\n\n".join(doc.page_content for doc in docs), "docs": docs}
         
-        # Create chain using LCEL (LangChain Expression Language)
-        self.qa_chain = (
-            {
-                "context": retriever | format_docs,
-                "question": RunnablePassthrough()
+        # Flatten the retrieval output into the prompt inputs
+        def unpack(inputs):
+            return {
+                "context": inputs["retrieved"]["context"],
+                "question": inputs["question"],
+                "docs": inputs["retrieved"]["docs"]
             }
-            | prompt
-            | self.llm
-            | StrOutputParser()
+        
+        # Create chain using LCEL (LangChain Expression Language); retrieval
+        # and formatting run once and the documents are returned alongside
+        # the answer
+        self.qa_chain = (
+            RunnableParallel(
+                {
+                    "retrieved": retriever | RunnableLambda(pack_docs),
+                    "question": RunnablePassthrough()
+                }
+            )
+            | RunnableLambda(unpack)
+            | RunnablePassthrough.assign(answer=prompt | self.llm | StrOutputParser())
         )
         
-        # Store retriever for getting source documents
         self.retriever = retriever
     
     def ask_question(self, question: str) -> dict:
@@ -157,16 +646,34 @@ Detailed Answer (with exact figures from the context):"""
         if self.qa_chain is None:
             raise ValueError("QA chain not initialized. Load documents first.")
         
-        # Get the answer
-        answer = self.qa_chain.invoke(question)
+        # Single pass: the chain returns the answer and the documents it used
+        result = self.qa_chain.invoke(question)
         
-        # Get source documents
-        source_documents = self.retriever.invoke(question)
+        return {
+            "question": question,
+            "answer": result["answer"],
+            "source_documents": result["docs"]
+        }
+    
+    async def aask_question(self, question: str) -> dict:
+        """
+        Ask a question about the annual report without blocking the event loop.
+        
+        Args:
+            question: Question to ask
+            
+        Returns:
+            Dictionary with answer and source documents
+        """
+        if self.qa_chain is None:
+            raise ValueError("QA chain not initialized. Load documents first.")
+        
+        result = await self.qa_chain.ainvoke(question)
         
         return {
             "question": question,
-            "answer": answer,
-            "source_documents": source_documents
+            "answer": result["answer"],
+            "source_documents": result["docs"]
         }
     
     def get_similar_chunks(self, query: str, k: int = 3) -> List[Document]:
@@ -183,7 +690,19 @@ Detailed Answer (with exact figures from the context):"""
         if self.vectorstore is None:
             raise ValueError("Vector store not initialized")
         
-        return self.vectorstore.similarity_search(query, k=k)
+        if self._emb_matrix is None:
+            return self.vectorstore.similarity_search(query, k=k)
+        
+        # Small corpus: one matrix-vector product plus a partial sort
+        k = min(k, len(self._chunk_meta))
+        if k <= 0:
+            return []
+        query_vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        query_vector /= max(float(np.linalg.norm(query_vector)), 1e-12)
+        scores = self._emb_matrix @ query_vector
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self._chunk_meta[i] for i in top]
     
     def validate_numerical_answer(self, answer: str, context: str) -> bool:
         """
@@ -196,13 +715,10 @@ Detailed Answer (with exact figures from the context):"""
         Returns:
             True if all numbers in answer are found in context
         """
-        # Extract numbers from answer and context
+        # Extract numbers from answer and context; the context set is built
+        # once per distinct context and reused across validation calls
         answer_figures = self.pdf_processor.extract_financial_data(answer)
-        context_figures = self.pdf_processor.extract_financial_data(context)
-        
-        # Check if all answer figures are in context
-        for figure in answer_figures:
-            if figure not in context_figures:
-                return False
+        context_figures = _figure_set(context)
         
-        return True
+        # Check if all answer figures are in context (hashed set lookups)
+        return context_figures.issuperset(answer_figures)
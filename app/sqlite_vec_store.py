@@ -0,0 +1,212 @@
+"""
+SQLite vector store backed by the sqlite-vec extension
+Stores chunk embeddings in a vec0 virtual table and chunk text in a companion table.
+"""
+
+import json
+import sqlite3
+import threading
+from typing import Any, Iterable, List, Optional
+import numpy as np
+import sqlite_vec
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+
+def is_supported() -> bool:
+    """
+    Check that this Python's sqlite3 module can load the sqlite-vec extension.
+    
+    Builds without extension loading (e.g. pyenv defaults, macOS system
+    Python) have no Connection.enable_load_extension.
+    
+    Returns:
+        True if sqlite-vec can be loaded
+    """
+    if not hasattr(sqlite3.Connection, "enable_load_extension"):
+        return False
+    try:
+        conn = sqlite3.connect(":memory:")
+        try:
+            conn.enable_load_extension(True)
+            sqlite_vec.load(conn)
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError):
+        return False
+    return True
+
+
+def _serialize(vectors: np.ndarray) -> List[bytes]:
+    """
+    L2-normalize vectors and serialize them as little-endian float32 blobs.
+    
+    Args:
+        vectors: (N, dim) array of embeddings
+    
+    Returns:
+        List of serialized vectors
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.maximum(norms, 1e-12)
+    return [row.astype("<f4").tobytes() for row in vectors]
+
+
+class SqliteVecStore(VectorStore):
+    """Vector store keeping embeddings in a single SQLite file via sqlite-vec."""
+    
+    def __init__(self, db_path: str, embedding: Embeddings):
+        """
+        Open (or create) a sqlite-vec database.
+        
+        Args:
+            db_path: Path to the SQLite database file
+            embedding: Embedding model used for queries
+        """
+        self.db_path = db_path
+        self._embedding = embedding
+        self._lock = threading.Lock()
+        
+        # Streamlit reruns the script on different threads; access is
+        # serialized through self._lock instead
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.enable_load_extension(True)
+        sqlite_vec.load(self._conn)
+        self._conn.enable_load_extension(False)
+    
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+    
+    def _create_tables(self, dimension: int) -> None:
+        """Create the vector and chunk tables if they do not exist."""
+        self._conn.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS vec_chunks USING vec0(embedding FLOAT[{dimension}])"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks("
+            "rowid INTEGER PRIMARY KEY, text TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+    
+    def add_embeddings(
+        self,
+        texts: List[str],
+        vectors: np.ndarray,
+        metadatas: Optional[List[dict]] = None
+    ) -> List[str]:
+        """
+        Add texts with precomputed embeddings.
+        
+        Args:
+            texts: Chunk texts
+            vectors: (N, dim) array of embeddings for the texts
+            metadatas: Optional metadata per text
+            
+        Returns:
+            List of row ids for the added texts
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        metadatas = metadatas or [{} for _ in texts]
+        
+        with self._lock, self._conn:
+            self._create_tables(vectors.shape[1])
+            start = self._conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM chunks").fetchone()[0] + 1
+            rowids = list(range(start, start + len(texts)))
+            self._conn.executemany(
+                "INSERT INTO vec_chunks(rowid, embedding) VALUES (?, ?)",
+                zip(rowids, _serialize(vectors))
+            )
+            self._conn.executemany(
+                "INSERT INTO chunks(rowid, text, metadata) VALUES (?, ?, ?)",
+                ((rowid, text, json.dumps(metadata)) for rowid, text, metadata in zip(rowids, texts, metadatas))
+            )
+        
+        return [str(rowid) for rowid in rowids]
+    
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        """
+        Embed and add texts to the store.
+        
+        Args:
+            texts: Texts to add
+            metadatas: Optional metadata per text
+            
+        Returns:
+            List of row ids for the added texts
+        """
+        texts = list(texts)
+        vectors = np.asarray(self._embedding.embed_documents(texts), dtype=np.float32)
+        return self.add_embeddings(texts, vectors, metadatas)
+    
+    def similarity_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        **kwargs: Any
+    ) -> List[Document]:
+        """
+        Return the k chunks nearest to an embedding.
+        
+        Args:
+            embedding: Query embedding
+            k: Number of chunks to retrieve
+            
+        Returns:
+            List of similar documents, nearest first
+        """
+        query = _serialize(np.asarray([embedding]))[0]
+        with self._lock:
+            rows = self._conn.execute(
+                "WITH knn AS ("
+                "SELECT rowid, distance FROM vec_chunks WHERE embedding MATCH ? AND k = ?"
+                ") SELECT chunks.text, chunks.metadata FROM knn "
+                "JOIN chunks ON chunks.rowid = knn.rowid ORDER BY knn.distance",
+                (query, k)
+            ).fetchall()
+        
+        return [Document(page_content=text, metadata=json.loads(metadata)) for text, metadata in rows]
+    
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        """
+        Return the k chunks most similar to a query.
+        
+        Args:
+            query: Query text
+            k: Number of chunks to retrieve
+            
+        Returns:
+            List of similar documents, most similar first
+        """
+        return self.similarity_search_by_vector(self._embedding.embed_query(query), k=k)
+    
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        db_path: str = "vectors.db",
+        **kwargs: Any
+    ) -> "SqliteVecStore":
+        """
+        Create a store at db_path and add the given texts.
+        
+        Args:
+            texts: Texts to add
+            embedding: Embedding model
+            metadatas: Optional metadata per text
+            db_path: Path to the SQLite database file
+            
+        Returns:
+            Populated SqliteVecStore
+        """
+        store = cls(db_path, embedding)
+        store.add_texts(texts, metadatas=metadatas)
+        return store